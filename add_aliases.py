@@ -16,7 +16,6 @@
 
 from __future__ import print_function
 import argparse
-import glob
 import os
 from os import path
 import shutil
@@ -101,22 +100,22 @@ def add_aliases(
 
   prefix_len = len(prefix)
   suffix_len = len(ext) + 1
-  filenames = [path.basename(f)
-               for f in glob.glob(path.join(srcdir, '%s*.%s' % (prefix, ext)))]
+  suffix = '.' + ext
   seq_to_file = {
       str_to_seq(name[prefix_len:-suffix_len]) : name
-      for name in filenames}
+      for name in os.listdir(srcdir)
+      if name.startswith(prefix) and name.endswith(suffix)}
 
   aliases = read_emoji_aliases(aliasfile)
   aliases_to_create = {}
   aliases_to_replace = []
   alias_exists = False
+  dst_names = frozenset(os.listdir(dstdir))
 
   def check_alias_seq(seq):
     alias_str = seq_to_str(seq)
     alias_name = '%s%s.%s' % (prefix, alias_str, ext)
-    alias_path = path.join(dstdir, alias_name)
-    if path.exists(alias_path):
+    if alias_name in dst_names:
       if replace:
         aliases_to_replace.append(alias_name)
       else:
@@ -144,7 +143,7 @@ def add_aliases(
 
   if canonical_names:
     print('adding %d canonical aliases' % len(canonical_to_file))
-    for seq, f in seq_to_file.iteritems():
+    for seq, f in seq_to_file.items():
       canonical_seq = unicode_data.get_canonical_emoji_sequence(seq)
       if canonical_seq and canonical_seq != seq:
         alias_name = check_alias_seq(canonical_seq)
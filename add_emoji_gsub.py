@@ -101,7 +101,7 @@ def create_lookup(table, font, flag=0):
     cmap = font_data.get_cmap(font)
 
     ligatures = {}
-    for output, (ch1, ch2) in table.iteritems():
+    for output, (ch1, ch2) in table.items():
         output = cmap[output]
         ch1 = get_glyph_name_or_create(ch1, font)
         ch2 = get_glyph_name_or_create(ch2, font)
@@ -186,8 +186,7 @@ def main(argv):
             create_lookup(EMOJI_KEYCAPS, font),
             create_lookup(EMOJI_FLAGS, font)])
 
-        font_data.delete_from_cmap(
-            font, EMOJI_FLAGS.keys() + EMOJI_KEYCAPS.keys())
+        font_data.delete_from_cmap(font, [*EMOJI_FLAGS, *EMOJI_KEYCAPS])
 
         font.save(font_name+'-fixed')
 
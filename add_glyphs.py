@@ -96,17 +96,19 @@ def collect_cps(seqs):
   return cps
 
 
+_GLYPH_NAME_RE = re.compile(r'^u(?:ni)?([0-9a-fA-F]{4,6})$')
+
+
 def get_glyphorder_cps_and_truncate(glyphOrder):
   """This scans glyphOrder for names that correspond to a single codepoint
   using the 'u(ni)XXXXXX' syntax.  All names that don't match are moved
   to the front the glyphOrder list in their original order, and the
   list is truncated.  The ones that do match are returned as a set of
   codepoints."""
-  glyph_name_re = re.compile(r'^u(?:ni)?([0-9a-fA-F]{4,6})$')
   cps = set()
   write_ix = 0
   for ix, name in enumerate(glyphOrder):
-    m = glyph_name_re.match(name)
+    m = _GLYPH_NAME_RE.match(name)
     if m:
       cps.add(int(m.group(1), 16))
     else:
@@ -210,6 +212,10 @@ def add_aliases_to_cmap(font, aliases):
     cmap[cp] = name
 
 
+ZWJ = 0x200d
+FITZPATRICK_SET = frozenset(range(0x1f3fb, 0x1f3ff + 1))
+
+
 def get_rtl_seq(seq):
   """Return the rtl variant of the sequence, if it has one, else the empty
   sequence.
@@ -220,17 +226,13 @@ def get_rtl_seq(seq):
   # Used to check for TAG_END 0xe007f as well but Android fontchain_lint
   # dislikes the resulting mangling of flags for England, Scotland, Wales.
 
-  ZWJ = 0x200d
-  def is_fitzpatrick(cp):
-    return 0x1f3fb <= cp <= 0x1f3ff
-
   if ZWJ not in seq:
     return ()
 
   rev_seq = list(seq)
   rev_seq.reverse()
   for i in range(1, len(rev_seq)):
-    if is_fitzpatrick(rev_seq[i-1]):
+    if rev_seq[i-1] in FITZPATRICK_SET:
       tmp = rev_seq[i]
       rev_seq[i] = rev_seq[i-1]
       rev_seq[i-1] = tmp
@@ -282,13 +284,14 @@ def add_ligature_sequences(font, seqs, aliases):
   if not seq_to_target_name:
     return
 
-  rtl_seq_to_target_name = {
-      get_rtl_seq(seq): name for seq, name in seq_to_target_name.items()}
-  seq_to_target_name.update(rtl_seq_to_target_name)
   # sequences that don't have rtl variants get mapped to the empty sequence,
-  # delete it.
-  if () in seq_to_target_name:
-    del seq_to_target_name[()]
+  # skip them.
+  rtl_seq_to_target_name = {}
+  for seq, name in seq_to_target_name.items():
+    rtl_seq = get_rtl_seq(seq)
+    if rtl_seq:
+      rtl_seq_to_target_name[rtl_seq] = name
+  seq_to_target_name.update(rtl_seq_to_target_name)
 
   # organize by first codepoint in sequence
   keyed_ligatures = collections.defaultdict(list)
@@ -309,11 +312,7 @@ def add_ligature_sequences(font, seqs, aliases):
     lig.LigGlyph = name
 
     ligatures = lookup.SubTable[0].ligatures
-    first_name = glyph_names[0]
-    try:
-      ligatures[first_name].append(lig)
-    except KeyError:
-      ligatures[first_name] = [lig]
+    ligatures.setdefault(glyph_names[0], []).append(lig)
 
   lookup = get_gsub_ligature_lookup(font)
   cmap = get_font_cmap(font)
@@ -19,6 +19,7 @@ from __future__ import print_function
 
 import argparse
 import collections
+import functools
 import glob
 import os
 from os import path
@@ -32,42 +33,42 @@ ZWJ = 0x200d
 EMOJI_VS = 0xfe0f
 
 END_TAG = 0xe007f
+BLACK_FLAG = 0x1f3f4
+BLACK_FLAG_SET = frozenset([BLACK_FLAG])
+
+TAG_SET = frozenset((
+    *range(0xe0030, 0xe003a),  # 0-9
+    *range(0xe0061, 0xe007b),  # a-z
+    END_TAG))
+
+@functools.lru_cache(maxsize=1)
+def _get_namedata():
+  """Return the sequence-to-name maps used by seq_name, with the emoji
+  variation selector stripped from the keys.  These are built on first
+  use and shared by all later calls."""
+  def strip_vs_map(seq_map):
+    return {
+        unicode_data.strip_emoji_vs(k): v
+        for k, v in seq_map.items()}
+  return (
+      strip_vs_map(unicode_data.get_emoji_combining_sequences()),
+      strip_vs_map(unicode_data.get_emoji_flag_sequences()),
+      strip_vs_map(unicode_data.get_emoji_modifier_sequences()),
+      strip_vs_map(unicode_data.get_emoji_zwj_sequences()),
+      )
 
-def _make_tag_set():
-  tag_set = set()
-  tag_set |= set(range(0xe0030, 0xe003a))  # 0-9
-  tag_set |= set(range(0xe0061, 0xe007b))  # a-z
-  tag_set.add(END_TAG)
-  return tag_set
-
-TAG_SET = _make_tag_set()
-
-_namedata = None
 
 def seq_name(seq):
-  global _namedata
-
-  if not _namedata:
-    def strip_vs_map(seq_map):
-      return {
-          unicode_data.strip_emoji_vs(k): v
-          for k, v in seq_map.iteritems()}
-    _namedata = [
-        strip_vs_map(unicode_data.get_emoji_combining_sequences()),
-        strip_vs_map(unicode_data.get_emoji_flag_sequences()),
-        strip_vs_map(unicode_data.get_emoji_modifier_sequences()),
-        strip_vs_map(unicode_data.get_emoji_zwj_sequences()),
-        ]
-
   if len(seq) == 1:
     return unicode_data.name(seq[0], None)
 
-  for data in _namedata:
+  namedata = _get_namedata()
+  for data in namedata:
     if seq in data:
       return data[seq]
   if EMOJI_VS in seq:
     non_vs_seq = unicode_data.strip_emoji_vs(seq)
-    for data in _namedata:
+    for data in namedata:
       if non_vs_seq in data:
         return data[non_vs_seq]
 
@@ -76,11 +77,20 @@ def seq_name(seq):
 
 def _check_no_vs(sorted_seq_to_filepath):
   """Our image data does not use emoji presentation variation selectors."""
-  for seq, fp in sorted_seq_to_filepath.iteritems():
+  for seq, fp in sorted_seq_to_filepath.items():
     if EMOJI_VS in seq:
       print('check no VS: FE0F in path: %s' % fp)
 
 
+# non-emoji cps that are valid in emoji sequences
+_SEQUENCE_CPS = frozenset((
+    ZWJ,
+    0x20e3,  # combining enclosing keycap
+    EMOJI_VS,  # variation selector (emoji presentation)
+    0xfe82b,  # PUA value for unknown flag
+    *TAG_SET))  # used in subregion tag sequences
+
+
 def _check_valid_emoji_cps(sorted_seq_to_filepath, unicode_version):
   """Ensure all cps in these sequences are valid emoji cps or specific cps
   used in forming emoji sequences.  This is a 'pre-check' that reports
@@ -92,18 +102,14 @@ def _check_valid_emoji_cps(sorted_seq_to_filepath, unicode_version):
   else:
     valid_cps = set(
         cp for cp in valid_cps if unicode_data.age(cp) <= unicode_version)
-  valid_cps.add(0x200d)  # ZWJ
-  valid_cps.add(0x20e3)  # combining enclosing keycap
-  valid_cps.add(0xfe0f)  # variation selector (emoji presentation)
-  valid_cps.add(0xfe82b)  # PUA value for unknown flag
-  valid_cps |= TAG_SET  # used in subregion tag sequences
-
-  not_emoji = {}
-  for seq, fp in sorted_seq_to_filepath.iteritems():
+  valid_cps |= _SEQUENCE_CPS
+
+  not_emoji = collections.defaultdict(list)
+  for seq, fp in sorted_seq_to_filepath.items():
+    if valid_cps.issuperset(seq):
+      continue
     for cp in seq:
       if cp not in valid_cps:
-        if cp not in not_emoji:
-          not_emoji[cp] = []
         not_emoji[cp].append(fp)
 
   if len(not_emoji):
@@ -121,7 +127,7 @@ def _check_zwj(sorted_seq_to_filepath):
   """Ensure zwj is only between two appropriate emoji.  This is a 'pre-check'
   that reports this specific problem."""
 
-  for seq, fp in sorted_seq_to_filepath.iteritems():
+  for seq, fp in sorted_seq_to_filepath.items():
     if ZWJ not in seq:
       continue
     if seq[0] == ZWJ:
@@ -149,7 +155,7 @@ def _check_zwj(sorted_seq_to_filepath):
 def _check_flags(sorted_seq_to_filepath):
   """Ensure regional indicators are only in sequences of one or two, and
   never mixed."""
-  for seq, fp in sorted_seq_to_filepath.iteritems():
+  for seq, fp in sorted_seq_to_filepath.items():
     have_reg = None
     for cp in seq:
       is_reg = unicode_data.is_regional_indicator(cp)
@@ -159,6 +165,7 @@ def _check_flags(sorted_seq_to_filepath):
         print(
             'check flags: mix of regional and non-regional in %s' % fp,
             file=sys.stderr)
+        break
     if have_reg and len(seq) > 2:
       # We provide dummy glyphs for regional indicators, so there are sequences
       # with single regional indicator symbols, the len check handles this.
@@ -171,12 +178,9 @@ def _check_tags(sorted_seq_to_filepath):
   validate against CLDR, just that there's a sequence of 2 or more tags starting
   and ending with the appropriate codepoints."""
 
-  BLACK_FLAG = 0x1f3f4
-  BLACK_FLAG_SET = set([BLACK_FLAG])
-  for seq, fp in sorted_seq_to_filepath.iteritems():
-    seq_set = set(cp for cp in seq)
-    overlap_set = seq_set & TAG_SET
-    if not overlap_set:
+  for seq, fp in sorted_seq_to_filepath.items():
+    seq_set = set(seq)
+    if seq_set.isdisjoint(TAG_SET):
       continue
     if seq[0] != BLACK_FLAG:
       print('check tags: bad start tag in %s' % fp)
@@ -193,7 +197,7 @@ def _check_skintone(sorted_seq_to_filepath):
   to take them.  May appear standalone, though.  Also check that emoji that take
   skin tone modifiers have a complete set."""
   base_to_modifiers = collections.defaultdict(set)
-  for seq, fp in sorted_seq_to_filepath.iteritems():
+  for seq, fp in sorted_seq_to_filepath.items():
     for i, cp in enumerate(seq):
       if unicode_data.is_skintone_modifier(cp):
         if i == 0:
@@ -209,11 +213,9 @@ def _check_skintone(sorted_seq_to_filepath):
               'check skintone: emoji skintone modifier applied to non-base ' +
               'at %d: %s' % (i, fp), file=sys.stderr)
         else:
-          if pcp not in base_to_modifiers:
-            base_to_modifiers[pcp] = set()
           base_to_modifiers[pcp].add(cp)
 
-  for cp, modifiers in sorted(base_to_modifiers.iteritems()):
+  for cp, modifiers in sorted(base_to_modifiers.items()):
     if len(modifiers) != 5:
       print(
           'check skintone: base %04x has %d modifiers defined (%s) in %s' % (
@@ -224,7 +226,7 @@ def _check_skintone(sorted_seq_to_filepath):
 
 def _check_zwj_sequences(sorted_seq_to_filepath, unicode_version):
   """Verify that zwj sequences are valid for the given unicode version."""
-  for seq, fp in sorted_seq_to_filepath.iteritems():
+  for seq, fp in sorted_seq_to_filepath.items():
     if ZWJ not in seq:
       continue
     age = unicode_data.get_emoji_sequence_age(seq)
@@ -232,16 +234,15 @@ def _check_zwj_sequences(sorted_seq_to_filepath, unicode_version):
       print('check zwj sequences: undefined sequence %s' % fp)
 
 
-def _check_no_alias_sources(sorted_seq_to_filepath):
+def _check_no_alias_sources(sorted_seq_to_filepath, aliases):
   """Check that we don't have sequences that we expect to be aliased to
   some other sequence."""
-  aliases = add_aliases.read_default_emoji_aliases()
-  for seq, fp in sorted_seq_to_filepath.iteritems():
+  for seq, fp in sorted_seq_to_filepath.items():
     if seq in aliases:
       print('check no alias sources: aliased sequence %s' % fp)
 
 
-def _check_coverage(seq_to_filepath, unicode_version):
+def _check_coverage(seq_to_filepath, unicode_version, aliases):
   """Ensure we have all and only the cps and sequences that we need for the
   font as of this version."""
 
@@ -253,7 +254,6 @@ def _check_coverage(seq_to_filepath, unicode_version):
       non_vs = unicode_data.strip_emoji_vs(k)
       non_vs_to_canonical[non_vs] = k
 
-  aliases = add_aliases.read_default_emoji_aliases()
   for k, v in sorted(aliases.items()):
     if v not in seq_to_filepath and v not in non_vs_to_canonical:
       alias_str = unicode_data.seq_to_string(k)
@@ -279,13 +279,13 @@ def _check_coverage(seq_to_filepath, unicode_version):
 
   # special characters
   # all but combining enclosing keycap are currently marked as emoji
-  for cp in [ord('*'), ord('#'), ord(u'\u20e3')] + range(0x30, 0x3a):
+  for cp in [ord('*'), ord('#'), ord(u'\u20e3'), *range(0x30, 0x3a)]:
     if cp not in emoji and tuple([cp]) not in seq_to_filepath:
       print('coverage: missing special %04x (%s)' % (cp, unicode_data.name(cp)))
 
   # combining sequences
   comb_seq_to_name = sorted(
-      unicode_data.get_emoji_combining_sequences(age=age).iteritems())
+      unicode_data.get_emoji_combining_sequences(age=age).items())
   for seq, name in comb_seq_to_name:
     if seq not in seq_to_filepath:
       # strip vs and try again
@@ -296,7 +296,7 @@ def _check_coverage(seq_to_filepath, unicode_version):
 
   # flag sequences
   flag_seq_to_name = sorted(
-      unicode_data.get_emoji_flag_sequences(age=age).iteritems())
+      unicode_data.get_emoji_flag_sequences(age=age).items())
   for seq, name in flag_seq_to_name:
     if seq not in seq_to_filepath:
       print('coverage: missing flag sequence %s (%s)' %
@@ -304,7 +304,7 @@ def _check_coverage(seq_to_filepath, unicode_version):
 
   # skin tone modifier sequences
   mod_seq_to_name = sorted(
-      unicode_data.get_emoji_modifier_sequences(age=age).iteritems())
+      unicode_data.get_emoji_modifier_sequences(age=age).items())
   for seq, name in mod_seq_to_name:
     if seq not in seq_to_filepath:
       print('coverage: missing modifier sequence %s (%s)' % (
@@ -323,7 +323,7 @@ def _check_coverage(seq_to_filepath, unicode_version):
     zwj_seq_without_vs.add(seq)
 
   for seq, name in sorted(
-      unicode_data.get_emoji_zwj_sequences(age=age).iteritems()):
+      unicode_data.get_emoji_zwj_sequences(age=age).items()):
     if EMOJI_VS in seq:
       test_seq = tuple(s for s in seq if s != EMOJI_VS)
     else:
@@ -340,8 +340,7 @@ def _check_coverage(seq_to_filepath, unicode_version):
 
 
 def check_sequence_to_filepath(seq_to_filepath, unicode_version, coverage):
-  sorted_seq_to_filepath = collections.OrderedDict(
-      sorted(seq_to_filepath.items()))
+  sorted_seq_to_filepath = dict(sorted(seq_to_filepath.items()))
   _check_no_vs(sorted_seq_to_filepath)
   _check_valid_emoji_cps(sorted_seq_to_filepath, unicode_version)
   _check_zwj(sorted_seq_to_filepath)
@@ -349,27 +348,32 @@ def check_sequence_to_filepath(seq_to_filepath, unicode_version, coverage):
   _check_tags(sorted_seq_to_filepath)
   _check_skintone(sorted_seq_to_filepath)
   _check_zwj_sequences(sorted_seq_to_filepath, unicode_version)
-  _check_no_alias_sources(sorted_seq_to_filepath)
+  aliases = add_aliases.read_default_emoji_aliases()
+  _check_no_alias_sources(sorted_seq_to_filepath, aliases)
   if coverage:
-    _check_coverage(sorted_seq_to_filepath, unicode_version)
+    _check_coverage(sorted_seq_to_filepath, unicode_version, aliases)
+
+
+_SEGMENT_RE = re.compile(r'^[0-9a-f]{4,6}$')
 
 
 def create_sequence_to_filepath(name_to_dirpath, prefix, suffix):
   """Check names, and convert name to sequences for names that are ok,
   returning a sequence to file path mapping.  Reports bad segments
   of a name to stderr."""
-  segment_re = re.compile(r'^[0-9a-f]{4,6}$')
+  start = len(prefix)
+  limit = -len(suffix)
   result = {}
-  for name, dirname in name_to_dirpath.iteritems():
+  for name, dirname in name_to_dirpath.items():
     if not name.startswith(prefix):
       print('expected prefix "%s" for "%s"' % (prefix, name))
       continue
 
-    segments = name[len(prefix): -len(suffix)].split('_')
+    segments = name[start:limit].split('_')
     segfail = False
     seq = []
     for s in segments:
-      if not segment_re.match(s):
+      if not _SEGMENT_RE.match(s):
         print('bad codepoint name "%s" in %s/%s' % (s, dirname, name))
         segfail = True
         continue
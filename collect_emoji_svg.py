@@ -81,10 +81,12 @@ def copy_with_rename(src_dir, dst_dir, accept_pred=None, rename=None):
     dst_filename = rename(src_filename) if rename else src_filename
     src = os.path.join(src_dir, src_filename)
     dst = os.path.join(dst_dir, dst_filename)
-    if os.path.exists(dst):
-      logging.debug('Replacing existing file %s', dst)
+    try:
       os.unlink(dst)
+      logging.debug('Replaced existing file %s', dst)
       replace_count += 1
+    except FileNotFoundError:
+      pass
     shutil.copy2(src, dst)
     logging.debug('cp -p %s %s', src, dst)
     count += 1
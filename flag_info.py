@@ -22,16 +22,19 @@ from __future__ import print_function
 import argparse
 import re
 import glob
+import itertools
 import os
 from os import path
 
+_EMOJI_FLAG_RE = re.compile('emoji_u(1f1[0-9a-f]{2})_(1f1[0-9a-f]{2}).png')
+_FLAG_RE = re.compile('([A-Z]{2}).png')
+
 def _flag_names_from_emoji_file_names(src):
   def _flag_char(char_str):
-    return unichr(ord('A') + int(char_str, 16) - 0x1f1e6)
-  flag_re = re.compile('emoji_u(1f1[0-9a-f]{2})_(1f1[0-9a-f]{2}).png')
+    return chr(ord('A') + int(char_str, 16) - 0x1f1e6)
   flags = set()
   for f in glob.glob(path.join(src, 'emoji_u*.png')):
-    m = flag_re.match(path.basename(f))
+    m = _EMOJI_FLAG_RE.match(path.basename(f))
     if not m:
       continue
     flag_short_name = _flag_char(m.group(1)) + _flag_char(m.group(2))
@@ -40,10 +43,9 @@ def _flag_names_from_emoji_file_names(src):
 
 
 def _flag_names_from_file_names(src):
-  flag_re = re.compile('([A-Z]{2}).png')
   flags = set()
   for f in glob.glob(path.join(src, '*.png')):
-    m = flag_re.match(path.basename(f))
+    m = _FLAG_RE.match(path.basename(f))
     if not m:
       print('no match')
       continue
@@ -52,15 +54,12 @@ def _flag_names_from_file_names(src):
 
 
 def _dump_flag_info(names):
-  prev = None
   print('%d flags' % len(names))
-  for n in sorted(names):
-    if n[0] != prev:
-      if prev:
-        print()
-      prev = n[0]
-    print(n, end=' ')
-  print()
+  # one line per initial letter
+  lines = [
+      ''.join(n + ' ' for n in group)
+      for _, group in itertools.groupby(sorted(names), key=lambda n: n[0])]
+  print('\n'.join(lines))
 
 
 def main():
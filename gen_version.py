@@ -166,8 +166,7 @@ def update_version(srcfile, dstfile, version, beta):
   version_str = 'Version %s;%s' % (version, _get_repo_version_str(beta))
   _replace_existing_version(lines, version, version_str)
   with open(dstfile, 'w') as f:
-    for line in lines:
-      f.write(line)
+    f.writelines(lines)
 
 
 def main():
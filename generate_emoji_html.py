@@ -22,7 +22,6 @@ builds an html page presenting the images along with their composition
 from __future__ import print_function
 
 import argparse
-import codecs
 import collections
 import datetime
 import glob
@@ -53,10 +52,7 @@ DirInfo = collections.namedtuple('DirInfo', 'directory, title, filemap')
 
 def _merge_keys(dicts):
   """Return the union of the keys in the list of dicts."""
-  keys = []
-  for d in dicts:
-    keys.extend(d.keys())
-  return frozenset(keys)
+  return frozenset().union(*dicts)
 
 
 def _generate_row_cells(
@@ -72,13 +68,13 @@ def _generate_row_cells(
       return 'exclude'
     return 'missing'
 
-  def _text_cell(text_dir):
-    text = ''.join(unichr(cp) for cp in key)
+  def _text_cell(text_dir, text):
     return '<span class="efont" dir="%s">%s</span>' % (text_dir, text)
 
   if font:
+    text = ''.join(map(chr, key))
     row_cells = [
-        CELL_PREFIX + _text_cell(text_dir)
+        CELL_PREFIX + _text_cell(text_dir, text)
         for text_dir in ('ltr', 'rtl')]
   else:
     row_cells = []
@@ -92,25 +88,35 @@ def _generate_row_cells(
   return row_cells
 
 
-def _get_desc(key_tuple, aliases, dir_infos, basepaths):
+def _get_key_to_filepath(dir_infos, basepaths):
+  """Return a map from key to the image path for it in the first dir_info
+  that has it."""
+  key_to_filepath = {}
+  for info, basepath in zip(dir_infos, basepaths):
+    for key, filename in info.filemap.items():
+      if key not in key_to_filepath:
+        key_to_filepath[key] = path.join(basepath, filename)
+  return key_to_filepath
+
+
+def _get_desc(key_tuple, aliases, key_to_filepath, cp_to_filepath):
+  """Return the sequence description cell for key_tuple.  cp_to_filepath
+  caches (canonical key, image path or None) per component cp and is shared
+  across rows."""
   CELL_PREFIX = '<td>'
   def _get_filepath(cp):
-    def get_key_filepath(key):
-      for i in range(len(dir_infos)):
-        info = dir_infos[i]
-        if key in info.filemap:
-          basepath = basepaths[i]
-          return path.join(basepath, info.filemap[key])
-      return None
-
-    cp_key = tuple([cp])
-    cp_key = unicode_data.get_canonical_emoji_sequence(cp_key) or cp_key
-    fp = get_key_filepath(cp_key)
-    if not fp:
-      if cp_key in aliases:
-        fp = get_key_filepath(aliases[cp_key])
-      else:
-        print('no alias for %s' % unicode_data.seq_to_string(cp_key))
+    if cp in cp_to_filepath:
+      cp_key, fp = cp_to_filepath[cp]
+    else:
+      cp_key = tuple([cp])
+      cp_key = unicode_data.get_canonical_emoji_sequence(cp_key) or cp_key
+      fp = key_to_filepath.get(cp_key)
+      if not fp:
+        if cp_key in aliases:
+          fp = key_to_filepath.get(aliases[cp_key])
+        else:
+          print('no alias for %s' % unicode_data.seq_to_string(cp_key))
+      cp_to_filepath[cp] = cp_key, fp
     if not fp:
       print('no part for %s in %s' % (
           unicode_data.seq_to_string(cp_key),
@@ -163,27 +169,25 @@ def _collect_aux_info(dir_infos, keys):
   """Returns a map from dir_info_index to a set of keys of additional images
   that we will take from the directory at that index."""
 
-  target_key_to_info_index = {}
+  key_set = frozenset(keys)
+  seen_target_keys = set()
+  aux_info = collections.defaultdict(set)
   for key in keys:
     if len(key) == 1:
       continue
     for cp in key:
       target_key = tuple([cp])
-      if target_key in keys or target_key in target_key_to_info_index:
+      if target_key in key_set or target_key in seen_target_keys:
         continue
+      seen_target_keys.add(target_key)
       for i, info in enumerate(dir_infos):
         if target_key in info.filemap:
-          target_key_to_info_index[target_key] = i
+          aux_info[i].add(target_key)
           break
-      if target_key not in target_key_to_info_index:
+      else:
         # we shouldn't try to use it in the description.  maybe report this?
         pass
 
-  # now we need to invert the map
-  aux_info = collections.defaultdict(set)
-  for key, index in target_key_to_info_index.items():
-    aux_info[index].add(key)
-
   return aux_info
 
 
@@ -216,6 +220,7 @@ def _generate_content(
     # color-3 we want female, basketball player, and color-3 images available
     # even if they aren't part of the target set.
     aux_info = _collect_aux_info(dir_infos, keys)
+    key_set = set(keys)
 
     # create image subdirectories in target dir, copy image files to them,
     # and adjust paths
@@ -225,7 +230,7 @@ def _generate_content(
       if not path.isdir(dstdir):
         os.mkdir(dstdir)
 
-      copy_keys = set(keys) | aux_info[i]
+      copy_keys = key_set | aux_info[i]
       srcdir = info.directory
       filemap = info.filemap
       for key in copy_keys:
@@ -256,10 +261,12 @@ def _generate_content(
   header_row.extend(['Sequence', 'Name'])
   lines.append('<th>'.join(header_row))
 
+  key_to_filepath = _get_key_to_filepath(dir_infos, basepaths)
+  cp_to_filepath = {}
   for key in keys:
     row = _generate_row_cells(
         key, font, aliases, excluded, dir_infos, basepaths, colors)
-    row.append(_get_desc(key, aliases, dir_infos, basepaths))
+    row.append(_get_desc(key, aliases, key_to_filepath, cp_to_filepath))
     row.append(_get_name(key, annotations))
     lines.append(''.join(row))
 
@@ -281,7 +288,7 @@ def _get_image_data(image_dir, ext, prefix):
     filename = path.basename(f)
     m = expect_re.match(filename)
     if not m:
-      if filename.startswith('unknown_flag.') or filename.startswith('p4p_'):
+      if filename.startswith(('unknown_flag.', 'p4p_')):
         continue
       fails.append('"%s" did not match: "%s"' % (expect_re.pattern, filename))
       continue
@@ -380,7 +387,7 @@ def _get_keys(dir_infos, aliases, limit, all_emoji, emoji_sort, ignore_missing):
     all_keys = unicode_data.get_emoji_sequences()
   if not all_emoji or ignore_missing:
     if len(dir_infos) == 1 or limit:
-      avail_keys = frozenset(dir_infos[0].filemap.keys())
+      avail_keys = frozenset(dir_infos[0].filemap)
     else:
       avail_keys = _merge_keys([info.filemap for info in dir_infos])
     if aliases:
@@ -405,6 +412,10 @@ def _generate_info_text(args):
   return '\n  '.join(lines)
 
 
+_ANNOTATION_LINE_RE = re.compile(
+    r'annotation:\s*(ok|warning|error)|([0-9a-f ]+)')
+
+
 def _parse_annotation_file(afile):
   """Parse file and return a map from sequences to one of 'ok', 'warning',
   or 'error'.
@@ -418,14 +429,13 @@ def _parse_annotation_file(afile):
   """
 
   annotations = {}
-  line_re = re.compile(r'annotation:\s*(ok|warning|error)|([0-9a-f ]+)')
   annotation = 'error'
   with open(afile, 'r') as f:
     for line in f:
       line = line.strip()
       if not line or line[0] == '#':
         continue
-      m = line_re.match(line)
+      m = _ANNOTATION_LINE_RE.match(line)
       if not m:
         raise Exception('could not parse annotation "%s"' % line)
       new_annotation = m.group(1)
@@ -444,9 +454,11 @@ def _parse_annotation_file(afile):
   return annotations
 
 
+_TEMPLATE_ID_RE = re.compile(r'\$([a-zA-Z0-9_]+)')
+
+
 def _instantiate_template(template, arg_dict):
-  id_regex = re.compile(r'\$([a-zA-Z0-9_]+)')
-  ids = set(m.group(1) for m in id_regex.finditer(template))
+  ids = set(m.group(1) for m in _TEMPLATE_ID_RE.finditer(template))
   keyset = set(arg_dict.keys())
   extra_args = keyset - ids
   if extra_args:
@@ -538,7 +550,7 @@ def write_html_page(
       TEMPLATE, {
           'title': page_title, 'fontFaceStyle': FONT_FACE_STYLE,
           'style': N_STYLE, 'content': content, 'info':info})
-  with codecs.open(filename, 'w', 'utf-8') as f:
+  with open(filename, 'w', encoding='utf-8') as f:
     f.write(text)
 
 
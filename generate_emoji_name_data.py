@@ -192,8 +192,8 @@ _CUSTOM_CAPS_NAMES = {
 # cases so we define a separate set of gendered emoji to remove.
 
 _NON_GENDER_CPS_TO_STRIP = frozenset(
-    [0xfe0f, 0x200d] +
-    range(unicode_data._FITZ_START, unicode_data._FITZ_END + 1))
+    [0xfe0f, 0x200d,
+     *range(unicode_data._FITZ_START, unicode_data._FITZ_END + 1)])
 
 _GENDER_CPS_TO_STRIP = frozenset([0x2640, 0x2642, 0x1f468, 0x1f469])
 
@@ -221,6 +221,12 @@ def _custom_name(seq):
   return name
 
 
+# Require space delimiting just in case...
+_AMPERSAND_RE = re.compile(r'\s&\s')
+# not \b at start because we retain capital at start of phrase
+_LOWER_WORDS_RE = re.compile(r'(\s(:?A|And|From|In|Of|With|For))\b')
+
+
 def _standard_name(seq):
   """Use the standard emoji name, with some algorithmic modifications.
 
@@ -255,12 +261,8 @@ def _standard_name(seq):
     return name
 
   name = name.title()
-  # Require space delimiting just in case...
-  name = re.sub(r'\s&\s', ' and ', name)
-  name = re.sub(
-      # not \b at start because we retain capital at start of phrase
-      r'(\s(:?A|And|From|In|Of|With|For))\b', lambda s: s.group(1).lower(),
-      name)
+  name = _AMPERSAND_RE.sub(' and ', name)
+  name = _LOWER_WORDS_RE.sub(lambda s: s.group(1).lower(), name)
 
   return name
 
@@ -316,9 +318,9 @@ def generate_names(
   # map to anything), so we need to adjust for this.
   canonical_aliases = generate_emoji_html._get_canonical_aliases()
 
-  aliases = set([
-      cps for cps in canonical_aliases.keys()
-      if not unicode_data.is_regional_indicator_seq(cps)])
+  aliases = {
+      cps for cps in canonical_aliases
+      if not unicode_data.is_regional_indicator_seq(cps)}
   aliases.add((0xfe82b,))  # unknown flag PUA
   excluded = aliases | generate_emoji_html._get_canonical_excluded()
 
@@ -368,7 +370,8 @@ def generate_names(
   with open(outfile, 'w') as f:
     indent = 2 if pretty_print else None
     separators = None if pretty_print else (',', ':')
-    json.dump(data, f, indent=indent, separators=separators)
+    # dumps rather than dump, dump always uses the pure-python encoder
+    f.write(json.dumps(data, indent=indent, separators=separators))
   print('wrote %s' % outfile)
 
 
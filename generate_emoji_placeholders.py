@@ -1,4 +1,5 @@
 from __future__ import print_function
+from concurrent import futures
 import os
 from os import path
 import subprocess
@@ -6,7 +7,6 @@ import subprocess
 OUTPUT_DIR = '/tmp/placeholder_emoji'
 
 def generate_image(name, text):
-  print(name, text.replace('\n', '_'))
   subprocess.check_call(
       ['convert', '-size', '100x100', 'label:%s' % text,
        '%s/%s' % (OUTPUT_DIR, name)])
@@ -21,7 +21,7 @@ def has_color_patch(values):
   return False
 
 def regional_to_ascii(cp):
-  return unichr(ord('A') + cp - 0x1f1e6)
+  return chr(ord('A') + cp - 0x1f1e6)
 
 def is_flag_sequence(values):
   if len(values) != 2:
@@ -36,7 +36,7 @@ def is_keycap_sequence(values):
   return len(values) == 2 and values[1] == 0x20e3
 
 def get_keycap_text(values):
-  return '-%c-' % unichr(values[0]) # convert gags on '['
+  return '-%c-' % chr(values[0]) # convert gags on '['
 
 char_map = {
     0x1f468: 'M',
@@ -65,32 +65,43 @@ def get_combining_text(values):
 if not path.isdir(OUTPUT_DIR):
   os.makedirs(OUTPUT_DIR)
 
-with open('sequences.txt', 'r') as f:
-  for seq in f:
-    seq = seq.strip()
-    text = None
-    values = [int(code, 16) for code in seq.split('_')]
-    if len(values) == 1:
-      val = values[0]
-      text = '%04X' % val # ensure upper case format
-    elif is_flag_sequence(values):
-      text = ''.join(regional_to_ascii(cp) for cp in values)
-    elif has_color_patch(values):
-      print('skipping color patch sequence %s' % seq)
-    elif is_keycap_sequence(values):
-      text = get_keycap_text(values)
-    else:
-      text = get_combining_text(values)
-      if not text:
-        print('missing %s' % seq)
-
-    if text:
-      if len(text) > 3:
-        if len(text) == 4:
-          hi = text[:2]
-          lo = text[2:]
-        else:
-          hi = text[:-3]
-          lo = text[-3:]
-        text = '%s\n%s' % (hi, lo)
-      generate_image('emoji_u%s.png' % seq, text)
+# each image is an independent convert subprocess, run them concurrently
+with futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+  jobs = []
+
+  with open('sequences.txt', 'r') as f:
+    for seq in f:
+      seq = seq.strip()
+      text = None
+      values = [int(code, 16) for code in seq.split('_')]
+      if len(values) == 1:
+        val = values[0]
+        text = '%04X' % val # ensure upper case format
+      elif is_flag_sequence(values):
+        text = ''.join(regional_to_ascii(cp) for cp in values)
+      elif has_color_patch(values):
+        print('skipping color patch sequence %s' % seq)
+      elif is_keycap_sequence(values):
+        text = get_keycap_text(values)
+      else:
+        text = get_combining_text(values)
+        if not text:
+          print('missing %s' % seq)
+
+      if text:
+        if len(text) > 3:
+          if len(text) == 4:
+            hi = text[:2]
+            lo = text[2:]
+          else:
+            hi = text[:-3]
+            lo = text[-3:]
+          text = '%s\n%s' % (hi, lo)
+        name = 'emoji_u%s.png' % seq
+        # print here rather than in the workers so lines don't interleave
+        print(name, text.replace('\n', '_'))
+        jobs.append(executor.submit(generate_image, name, text))
+
+  # result() re-raises any convert failure
+  for job in jobs:
+    job.result()
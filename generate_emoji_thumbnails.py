@@ -23,6 +23,8 @@ copies named for the aliases."""
 
 import argparse
 import collections
+from concurrent import futures
+import itertools
 import logging
 import os
 from os import path
@@ -51,20 +53,46 @@ def create_thumbnail(src_path, dst_path, crop):
   subprocess.check_call(cmd)
 
 
+def _is_up_to_date(src_path, dst_path):
+  try:
+    return os.stat(dst_path).st_mtime >= os.stat(src_path).st_mtime
+  except FileNotFoundError:
+    return False
+
+
+def _write_thumbnail(src_path, dst_path, crop, incremental):
+  """Write the thumbnail for src_path to dst_path.  The caller guarantees no
+  other task or alias copy writes dst_path, so both the incremental skip and
+  the cleanup on failure only ever see this task's own output."""
+  if incremental and _is_up_to_date(src_path, dst_path):
+    logger.debug('thumbnail up to date: %s' % path.basename(dst_path))
+  else:
+    try:
+      create_thumbnail(src_path, dst_path, crop)
+    except:
+      # don't leave a partial thumbnail that a later incremental run would
+      # take to be up to date
+      try:
+        os.unlink(dst_path)
+      except FileNotFoundError:
+        pass
+      raise
+    logger.info('wrote thumbnail%s: %s' % (
+        ' with crop' if crop else '', path.basename(dst_path)))
+
+
 def get_inv_aliases():
   """Return a mapping from target to list of sources for all alias
   targets in either the default alias table or the unknown_flag alias
   table."""
 
-  inv_aliases = collections.defaultdict(list)
-
   standard_aliases = add_aliases.read_default_emoji_aliases()
-  for k, v in standard_aliases.iteritems():
-    inv_aliases[v].append(k)
-
   unknown_flag_aliases = add_aliases.read_emoji_aliases(
       'unknown_flag_aliases.txt')
-  for k, v in unknown_flag_aliases.iteritems():
+
+  inv_aliases = collections.defaultdict(list)
+  for k, v in itertools.chain(
+      standard_aliases.items(), unknown_flag_aliases.items()):
     inv_aliases[v].append(k)
 
   return inv_aliases
@@ -84,10 +112,12 @@ def sequence_to_filename(seq, prefix, suffix):
   return ''.join((prefix, unicode_data.seq_to_string(seq), suffix))
 
 
-def create_thumbnails_and_aliases(src_dir, dst_dir, crop, dst_prefix):
+def create_thumbnails_and_aliases(
+    src_dir, dst_dir, crop, dst_prefix, incremental=False):
   """Creates thumbnails in dst_dir based on sources in src.dir, using
   dst_prefix. Assumes the source prefix is 'emoji_u' and the common suffix
-  is '.png'."""
+  is '.png'.  If incremental is true, thumbnails newer than their source are
+  kept; this does not detect changes to crop or src_dir."""
 
   src_dir = tool_utils.resolve_path(src_dir)
   if not path.isdir(src_dir):
@@ -100,7 +130,9 @@ def create_thumbnails_and_aliases(src_dir, dst_dir, crop, dst_prefix):
 
   inv_aliases = get_inv_aliases()
 
-  for src_file in os.listdir(src_dir):
+  dst_to_src = {}
+  dst_to_alias_paths = {}
+  for src_file in sorted(os.listdir(src_dir)):
     try:
       seq = unicode_data.strip_emoji_vs(
           filename_to_sequence(src_file, src_prefix, suffix))
@@ -112,16 +144,39 @@ def create_thumbnails_and_aliases(src_dir, dst_dir, crop, dst_prefix):
 
     dst_file = sequence_to_filename(seq, dst_prefix, suffix)
     dst_path = path.join(dst_dir, dst_file)
-
-    create_thumbnail(src_path, dst_path, crop)
-    logger.info('wrote thumbnail%s: %s' % (
-        ' with crop' if crop else '', dst_file))
-
-    for alias_seq in inv_aliases.get(seq, ()):
-      alias_file = sequence_to_filename(alias_seq, dst_prefix, suffix)
-      alias_path = path.join(dst_dir, alias_file)
-      shutil.copy2(dst_path, alias_path)
-      logger.info('wrote alias: %s' % alias_file)
+    if dst_path in dst_to_src:
+      logger.warning('%s and %s both map to %s, skipping %s' % (
+          path.basename(dst_to_src[dst_path]), src_file, dst_file, src_file))
+      continue
+    dst_to_src[dst_path] = src_path
+
+    dst_to_alias_paths[dst_path] = [
+        path.join(dst_dir, sequence_to_filename(alias_seq, dst_prefix, suffix))
+        for alias_seq in inv_aliases.get(seq, ())]
+
+  # an alias whose sequence has its own image keeps its own thumbnail
+  alias_copies = []
+  for dst_path, alias_paths in sorted(dst_to_alias_paths.items()):
+    for alias_path in alias_paths:
+      if alias_path in dst_to_src:
+        logger.info('alias has its own image, not copying: %s' %
+                    path.basename(alias_path))
+        continue
+      alias_copies.append((dst_path, alias_path))
+
+  # each thumbnail is an independent convert subprocess with its own output
+  # path, so run them concurrently; list() surfaces any failure from the
+  # workers.
+  with futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+    list(executor.map(
+        lambda item: _write_thumbnail(
+            item[1], item[0], crop=crop, incremental=incremental),
+        dst_to_src.items()))
+
+  # copy aliases only once every thumbnail they copy from is complete
+  for dst_path, alias_path in alias_copies:
+    shutil.copy2(dst_path, alias_path)
+    logger.info('wrote alias: %s' % path.basename(alias_path))
 
 
 def main():
@@ -141,6 +196,10 @@ def main():
   parser.add_argument(
       '-c', '--crop', help='crop images (will automatically crop if '
       'src dir is the default)', action='store_true')
+  parser.add_argument(
+      '-i', '--incremental', help='keep thumbnails that are newer than '
+      'their source (does not detect changes to crop or src_dir)',
+      action='store_true')
   parser.add_argument(
       '-v', '--verbose', help='write log output', metavar='level',
       choices='warning info debug'.split(), const='info',
@@ -152,7 +211,7 @@ def main():
 
   crop = args.crop or (args.src_dir == SRC_DEFAULT)
   create_thumbnails_and_aliases(
-      args.src_dir, args.dst_dir, crop, args.prefix)
+      args.src_dir, args.dst_dir, crop, args.prefix, args.incremental)
 
 
 if __name__ == '__main__':
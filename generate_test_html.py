@@ -125,14 +125,15 @@ View using Firefox&nbsp;26 and later.
   elif verbosity > 1 and not glyph:
     print("Using initial glyph '%s'" % initial_glyph_str)
 
-  lines = [header % font_name]
-  lines.append(body_head % {'font':font_name, 'glyph':initial_glyph_str,
-                            'glyph_hex':initial_glyph_hex})
-  lines.extend(text_parts) # we'll end up with space between each emoji
-  lines.append(body_tail)
-  output = '\n'.join(lines)
   with open(html_name, 'w') as fp:
-    fp.write(output)
+    fp.write(header % font_name)
+    fp.write('\n')
+    fp.write(body_head % {'font':font_name, 'glyph':initial_glyph_str,
+                          'glyph_hex':initial_glyph_hex})
+    # we'll end up with space between each emoji
+    fp.writelines('\n' + text for text in text_parts)
+    fp.write('\n')
+    fp.write(body_tail)
   if verbosity:
     print('Wrote ' + html_name)
 
@@ -28,37 +28,43 @@ from nototools import font_data
 import add_emoji_gsub
 
 
-def get_glyph_name_from_gsub(char_seq, font):
+def get_ligature_index(font):
+    """Map (first glyph, component glyphs) to the ligature glyph for all
+    ligatures in GSUB.  Lookups are searched in order and the first match
+    wins.
+    """
+    index = {}
+    for lookup in font['GSUB'].table.LookupList.Lookup:
+        for first_glyph, ligatures in lookup.SubTable[0].ligatures.items():
+            for ligature in ligatures:
+                index.setdefault(
+                    (first_glyph, tuple(ligature.Component)),
+                    ligature.LigGlyph)
+    return index
+
+
+def get_glyph_name_from_gsub(char_seq, cmap, ligature_index):
     """Find the glyph name for ligature of a given character sequence from GSUB.
     """
-    cmap = font_data.get_cmap(font)
     # FIXME: So many assumptions are made here.
     try:
-        first_glyph = cmap[char_seq[0]]
-        rest_of_glyphs = [cmap[ch] for ch in char_seq[1:]]
+        glyphs = tuple(cmap[ch] for ch in char_seq)
     except KeyError:
         return None
-
-    for lookup in font['GSUB'].table.LookupList.Lookup:
-        ligatures = lookup.SubTable[0].ligatures
-        try:
-            for ligature in ligatures[first_glyph]:
-                if ligature.Component == rest_of_glyphs:
-                    return ligature.LigGlyph
-        except KeyError:
-            continue
-    return None
+    return ligature_index.get((glyphs[0], glyphs[1:]))
 
 
 def add_pua_cmap(source_file, target_file):
     """Add PUA characters to the cmap of the first font and save as second."""
     font = ttLib.TTFont(source_file)
     cmap = font_data.get_cmap(font)
+    ligature_index = get_ligature_index(font)
     for pua, (ch1, ch2) in itertools.chain(
         add_emoji_gsub.EMOJI_KEYCAPS.items(), add_emoji_gsub.EMOJI_FLAGS.items()
     ):
         if pua not in cmap:
-            glyph_name = get_glyph_name_from_gsub([ch1, ch2], font)
+            glyph_name = get_glyph_name_from_gsub(
+                [ch1, ch2], cmap, ligature_index)
             if glyph_name is not None:
                 cmap[pua] = glyph_name
     font.save(target_file)
@@ -46,18 +46,22 @@ def strip_vs_from_filenames(imagedir, prefix, ext, dry_run=False):
   names = [path.basename(f)
            for f in glob.glob(
                path.join(imagedir, '%s*.%s' % (prefix, ext)))]
+  name_set = frozenset(names)
   renames = {}
   for name in names:
+    # most names have no vs, skip them before parsing the sequence
+    if 'fe0f' not in name.lower():
+      continue
     seq = str_to_seq(name[prefix_len:-suffix_len])
     if seq and EMOJI_VS in seq:
       newname = '%s%s.%s' % (prefix, seq_to_str(strip_vs(seq)), ext)
-      if newname in names:
+      if newname in name_set:
         print('%s non-vs name %s already exists.' % (
             name, newname), file=sys.stderr)
         return
       renames[name] = newname
 
-  for k, v in renames.iteritems():
+  for k, v in renames.items():
     if dry_run:
       print('%s -> %s' % (k, v))
     else:
@@ -19,7 +19,7 @@
 
 
 from __future__ import print_function
-import sys, struct
+import sys, struct, array
 from png import PNG
 import os
 from os import path
@@ -27,18 +27,19 @@ from os import path
 from nototools import font_data
 
 
-try:
-	unichr  # py2
-except NameError:
-	unichr = chr  # py3
-
-def get_glyph_name_from_gsub (string, font, cmap_dict):
+def get_ligature_index (font):
 	ligatures = font['GSUB'].table.LookupList.Lookup[0].SubTable[0].ligatures
-	first_glyph = cmap_dict[ord (string[0])]
-	rest_of_glyphs = [cmap_dict[ord (ch)] for ch in string[1:]]
-	for ligature in ligatures[first_glyph]:
-		if ligature.Component == rest_of_glyphs:
-			return ligature.LigGlyph
+	index = {}
+	for first_glyph, ligature_list in ligatures.items ():
+		for ligature in ligature_list:
+			# keep the first match, as a linear scan of the list would
+			index.setdefault ((first_glyph, tuple (ligature.Component)),
+					  ligature.LigGlyph)
+	return index
+
+def get_glyph_name_from_gsub (string, ligature_index, cmap_dict):
+	glyphs = tuple (cmap_dict[ord (ch)] for ch in string)
+	return ligature_index.get ((glyphs[0], glyphs[1:]))
 
 
 def div (a, b):
@@ -88,6 +89,14 @@ class CBDT:
 		self.strike_metrics = strike_metrics
 		self.glyph_maps = []
 
+		# vertical centering only depends on the strike, not the glyph
+		ascent = self.font_metrics.ascent
+		descent = self.font_metrics.descent
+		upem = self.font_metrics.upem
+		y_ppem = strike_metrics.y_ppem
+		self.line_height = (ascent + descent) * y_ppem / float (upem)
+		self.line_ascent = ascent * y_ppem / float (upem)
+
 	def write_glyphs (self, glyphs, glyph_filenames, image_format):
 
 		write_func = self.image_write_func (image_format)
@@ -104,20 +113,15 @@ class CBDT:
 		glyph_maps = self.glyph_maps
 		del self.glyph_maps
 		del self.strike_metrics
+		del self.line_height
+		del self.line_ascent
 		return glyph_maps
 
 	def write_glyphMetrics (self, width, height, big_metrics):
 
-		ascent = self.font_metrics.ascent
-		descent = self.font_metrics.descent
-		upem = self.font_metrics.upem
-		y_ppem = self.strike_metrics.y_ppem
-
 		x_bearing = 0
 		# center vertically
-		line_height = (ascent + descent) * y_ppem / float (upem)
-		line_ascent = ascent * y_ppem / float (upem)
-		y_bearing = int (round (line_ascent - .5 * (line_height - height)))
+		y_bearing = int (round (self.line_ascent - .5 * (self.line_height - height)))
 		# fudge y_bearing if calculations are a bit off
 		if y_bearing == 128:
 			y_bearing = 127
@@ -175,17 +179,17 @@ class CBDT:
 			self.write (data)
 			return
 
-		# Unexpected stride or endianness, do it the slow way
+		# Unexpected stride or endianness, convert a row at a time
 		offset = 0
 		for y in range (height):
-			for x in range (width):
-				pixel = data[offset + 4 * x: offset + 4 * (x + 1)]
-				# Convert to little endian
-				pixel = struct.pack ("<I", struct.unpack ("@I", pixel)[0])
-				self.write (pixel)
+			row = array.array ("I", bytes (data[offset: offset + 4 * width]))
+			# Convert to little endian
+			if sys.byteorder != "little":
+				row.byteswap ()
+			self.write (row.tobytes ())
 			offset += stride
 
-	png_allowed_chunks =  [b"IHDR", b"PLTE", b"tRNS", b"sRGB", b"IDAT", b"IEND"]
+	png_allowed_chunks = frozenset ((b"IHDR", b"PLTE", b"tRNS", b"sRGB", b"IDAT", b"IEND"))
 
 	def write_format17 (self, png):
                 self.write_format17or18(png, False)
@@ -307,20 +311,8 @@ class CBLC:
 
 	def write_bitmapSizeTable (self, glyph_maps):
 
-		# count number of ranges
-		count = 1
-		start = glyph_maps[0].glyph
-		last_glyph = start
-		last_image_format = glyph_maps[0].image_format
-		for gmap in glyph_maps[1:-1]:
-			if last_glyph + 1 != gmap.glyph or last_image_format != gmap.image_format:
-				count += 1
-			last_glyph = gmap.glyph
-			last_image_format = gmap.image_format
-		headersLen = count * 8
-
-		headers = bytearray ()
-		subtables = bytearray ()
+		# collect ranges of consecutive glyphs sharing an image format
+		ranges = []
 		start = glyph_maps[0].glyph
 		start_id = 0
 		last_glyph = start
@@ -328,23 +320,25 @@ class CBLC:
 		last_id = 0
 		for gmap in glyph_maps[1:-1]:
 			if last_glyph + 1 != gmap.glyph or last_image_format != gmap.image_format:
-				headers.extend (struct.pack(">HHL", start, last_glyph, headersLen + len (subtables)))
-				self.push_stream (subtables)
-				self.write_indexSubTable1 (glyph_maps[start_id:last_id+2])
-				self.pop_stream ()
-
+				ranges.append ((start, last_glyph, start_id, last_id))
 				start = gmap.glyph
 				start_id = last_id + 1
 			last_glyph = gmap.glyph
 			last_image_format = gmap.image_format
 			last_id += 1
-		headers.extend (struct.pack(">HHL", start, last_glyph, headersLen + len (subtables)))
-		self.push_stream (subtables)
-		self.write_indexSubTable1 (glyph_maps[start_id:last_id+2])
-		self.pop_stream ()
+		ranges.append ((start, last_glyph, start_id, last_id))
+		headersLen = len (ranges) * 8
+
+		headers = bytearray ()
+		subtables = bytearray ()
+		for start, last_glyph, start_id, last_id in ranges:
+			headers.extend (struct.pack(">HHL", start, last_glyph, headersLen + len (subtables)))
+			self.push_stream (subtables)
+			self.write_indexSubTable1 (glyph_maps[start_id:last_id+2])
+			self.pop_stream ()
 
 		indexTablesSize = len (headers) + len (subtables)
-		numberOfIndexSubTables = count
+		numberOfIndexSubTables = len (ranges)
 		bitmapSizeTableSize = 48 * self.num_strikes
 
 		indexSubTableArrayOffset = 8 + bitmapSizeTableSize + len (self.otherTables)
@@ -484,6 +478,8 @@ By default they are dropped.
 	eblc.write_header ()
 	eblc.start_strikes (len (img_prefixes))
 
+	ligature_index = None
+
 	def is_vs(cp):
                 return cp >= 0xfe00 and cp <= 0xfe0f
 
@@ -498,13 +494,13 @@ By default they are dropped.
 			if "_" in codes:
 				pieces = codes.split ("_")
 				cps = [int(code, 16) for code in pieces]
-				uchars = "".join (unichr(cp) for cp in cps if not is_vs(cp))
+				uchars = "".join (chr(cp) for cp in cps if not is_vs(cp))
 			else:
 				cp = int(codes, 16)
 				if is_vs(cp):
 				        print("ignoring unexpected vs input %04x" % cp)
 				        continue
-				uchars = unichr(cp)
+				uchars = chr(cp)
 			img_files[uchars] = img_file
 		if not img_files:
 			raise Exception ("No image files found in '%s'." % glb)
@@ -520,13 +516,11 @@ By default they are dropped.
                                         print("no cmap entry for %x" % ord(uchars))
                                         raise ValueError("%x" % ord(uchars))
 			else:
-				glyph_name = get_glyph_name_from_gsub (uchars, font, unicode_cmap.cmap)
+				if ligature_index is None:
+					ligature_index = get_ligature_index (font)
+				glyph_name = get_glyph_name_from_gsub (uchars, ligature_index, unicode_cmap.cmap)
 			glyph_id = font.getGlyphID (glyph_name)
 			glyph_imgs[glyph_id] = img_file
-			if "verbose" in options:
-				uchars_name = ",".join (["%04X" % ord (char) for char in uchars])
-				# print "Matched U+%s: id=%d name=%s image=%s" % (
-                                #    uchars_name, glyph_id, glyph_name, img_file)
 
 			advance += glyph_metrics[glyph_name][0]
 			w, h = PNG (img_file).get_size ()
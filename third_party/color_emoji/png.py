@@ -22,19 +22,13 @@ import sys
 from io import BytesIO
 
 
-try:
-	basestring  # py2
-except NameError:
-	basestring = str  # py3
-
-
 class PNG:
 
 	signature = bytearray ((137,80,78,71,13,10,26,10))
 
 	def __init__ (self, f):
 
-		if isinstance(f, basestring):
+		if isinstance(f, str):
 			f = open (f, 'rb')
 
 		self.f = f